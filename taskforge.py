@@ -20,7 +20,7 @@
 #
 #  Requisitos:
 #  - Python 3.8+
-#  - Apenas biblioteca padrão
+#  - Apenas biblioteca padrão (orjson opcional, acelera o JSON)
 #  - Execução como root
 #
 # ----------------------------------------------------------
@@ -37,44 +37,84 @@
 
 import json
 import os
+import stat
 import threading
 import time
+from bisect import bisect_right
 from datetime import datetime
-from uuid import uuid4
+from functools import lru_cache
+from secrets import token_hex
+
+try:
+    import orjson
+except ImportError:  # sem orjson: usa o json da biblioteca padrão
+    orjson = None
 
 DB_FILE = "tarefas.json"
 DATE_FMT = "%Y-%m-%d %H:%M"
 
 lock = threading.Lock()
 
+# Cache em memória do arquivo: só é relido quando o mtime muda.
+# Cada atualização troca o dicionário inteiro, então quem pega uma
+# referência vê sempre lista e índice consistentes entre si. Fora
+# daqui o conteúdo nunca é alterado: quem lê recebe uma lista nova, e
+# quem altera uma tarefa copia o dicionário antes (ver localizar_tarefa);
+# só salvar_tarefas (depois de gravar no disco) troca o cache.
+_CACHE = {
+    "tarefas": None,
+    "idx": {},
+    "id_prefix": {},
+    "haystack": "",
+    "offsets": [0],
+    "proximo_prazo": None,
+    "mtime": 0,
+}
+
+# momento da última varredura de vencidas, em time.monotonic()
+# (ver remover_vencidas); None enquanto nenhuma rodou
+_LAST_SWEEP = None
+
 
 # =========================
 # Utilidades básicas
 # =========================
 
-def agora():
-    return datetime.now()
-
-
 def gerar_id():
-    return str(uuid4())
+    return token_hex(16)
 
 
 def parse_prazo(s):
     if not s:
         return None
+    s = s.strip()
     try:
-        return datetime.strptime(s.strip(), DATE_FMT)
+        # caminho rápido para o formato exato de DATE_FMT; só dígitos
+        # ASCII, pois int() aceitaria sinais, espaços e "_"
+        if (len(s) == 16 and s[4] == "-" and s[7] == "-"
+                and s[10] == " " and s[13] == ":"):
+            partes = (s[0:4], s[5:7], s[8:10], s[11:13], s[14:16])
+            if all(p.isascii() and p.isdigit() for p in partes):
+                return datetime(*map(int, partes))
+        return datetime.strptime(s, DATE_FMT)
     except ValueError:
         return None
 
 
+@lru_cache(maxsize=1024)
+def _iso_para_datetime(s):
+    # os mesmos prazos se repetem a cada varredura
+    return datetime.fromisoformat(s)
+
+
 def format_prazo(dt):
     if not dt:
         return "—"
-    if isinstance(dt, str):
+    if isinstance(dt, (int, float)):
+        dt = datetime.fromtimestamp(dt)
+    elif isinstance(dt, str):
         try:
-            dt = datetime.fromisoformat(dt)
+            dt = _iso_para_datetime(dt)
         except Exception:
             return dt
     return dt.strftime(DATE_FMT)
@@ -84,55 +124,213 @@ def format_prazo(dt):
 # Persistência
 # =========================
 
-def carregar_tarefas():
-    if not os.path.exists(DB_FILE):
-        return []
+def _loads(data):
+    if orjson:
+        return orjson.loads(data)
+    return json.loads(data)
 
-    with open(DB_FILE, "r", encoding="utf-8") as f:
-        try:
-            tarefas = json.load(f)
-        except Exception:
-            return []
 
-    # migração automática: remove campos obsoletos
+def _dumps(tarefas, compact=False):
+    if orjson:
+        return orjson.dumps(tarefas, option=0 if compact else orjson.OPT_INDENT_2)
+    if compact:
+        return json.dumps(tarefas, separators=(",", ":"), ensure_ascii=False).encode("utf-8")
+    return json.dumps(tarefas, indent=4, ensure_ascii=False).encode("utf-8")
+
+
+def _atualizar_cache(tarefas, mtime):
+    global _CACHE
+    # prefixo de 8 caracteres (o que é exibido ao usuário) -> tarefa;
+    # prefixos repetidos ficam como None e caem na busca completa
+    id_prefix = {}
+    for t in tarefas:
+        p = t["id"][:8]
+        id_prefix[p] = None if p in id_prefix else t
+
+    # texto de busca único: "id\0título" de cada tarefa, separados por
+    # \0; offsets[i] é onde começa a tarefa i (mais uma sentinela)
+    partes = []
+    offsets = []
+    pos = 0
+    for t in tarefas:
+        parte = f"{t['id']}\0{t['titulo'].lower()}"
+        partes.append(parte)
+        offsets.append(pos)
+        pos += len(parte) + 1
+    offsets.append(pos)
+
+    _CACHE = {
+        "tarefas": tarefas,
+        "idx": {t["id"]: i for i, t in enumerate(tarefas)},
+        "id_prefix": id_prefix,
+        "haystack": "\0".join(partes),
+        "offsets": offsets,
+        # prazo mais próximo: a varredura só percorre a lista quando
+        # ele já passou
+        "proximo_prazo": min((t["prazo_ts"] for t in tarefas if t.get("prazo_ts")), default=None),
+        "mtime": mtime,
+    }
+    return _CACHE
+
+
+def _carregar_cache():
+    try:
+        mtime = os.stat(DB_FILE).st_mtime_ns
+    except FileNotFoundError:
+        return _atualizar_cache([], 0)
+
+    cache = _CACHE
+    if cache["tarefas"] is not None and cache["mtime"] == mtime:
+        return cache
+
+    # o arquivo pode ter sumido desde o stat; o mtime guardado vem do
+    # próprio arquivo aberto, para corresponder ao conteúdo lido
+    try:
+        with open(DB_FILE, "rb") as f:
+            data = f.read()
+            mtime = os.fstat(f.fileno()).st_mtime_ns
+    except FileNotFoundError:
+        return _atualizar_cache([], 0)
+
+    try:
+        tarefas = _loads(data)
+    except Exception:
+        return _atualizar_cache([], 0)
+
+    # migração automática: preenche prazo_ts em arquivos antigos
     for t in tarefas:
+        if "prazo_ts" not in t:
+            t["prazo_ts"] = None
+            if t.get("prazo"):
+                try:
+                    t["prazo_ts"] = _iso_para_datetime(t["prazo"]).timestamp()
+                except Exception:
+                    pass
+
+    return _atualizar_cache(tarefas, mtime)
+
+
+def carregar_tarefas():
+    # lista nova, mas os dicionários são os do cache: não altere
+    return list(_carregar_cache()["tarefas"])
+
+
+def localizar_tarefa(tid):
+    # lista nova em que só a tarefa com esse id é uma cópia, pronta
+    # para ser alterada e salva
+    cache = _carregar_cache()
+    tarefas = list(cache["tarefas"])
+    i = cache["idx"].get(tid)
+    if i is None:
+        return tarefas, None
+    tarefas[i] = item = dict(tarefas[i])
+    return tarefas, item
+
+
+def migrar_uma_vez():
+    # migração única, na inicialização: remove campos obsoletos e
+    # converte criado_em (ISO) para criado_em_ts (epoch)
+    tarefas = carregar_tarefas()
+    alterou = False
+    for i, t in enumerate(tarefas):
+        if "tipo" not in t and "criado_em" not in t:
+            continue
+        tarefas[i] = t = dict(t)  # não altera o dicionário do cache
+        alterou = True
         t.pop("tipo", None)
+        if "criado_em" in t:
+            try:
+                t["criado_em_ts"] = datetime.fromisoformat(t["criado_em"]).timestamp()
+            except Exception:
+                t["criado_em_ts"] = None
+            del t["criado_em"]
+
+    if alterou:
+        salvar_tarefas(tarefas)
+
 
-    return tarefas
+def _atomic_write_bytes(path, data, ao_trocar=None):
+    # grava num arquivo temporário e troca de uma vez: uma queda no
+    # meio da escrita nunca deixa o arquivo pela metade. Cada thread
+    # usa seu próprio temporário, então o lock cobre só a troca e
+    # ao_trocar(mtime), chamado logo em seguida (o rename não altera
+    # o mtime): assim a última troca é sempre a que fica no cache.
+    # Os bytes já vêm codificados, então vão direto para o descritor.
+    # O temporário herda as permissões do arquivo atual (ex.: um
+    # chmod 600 feito pelo usuário), aplicadas antes de qualquer dado.
+    tmp = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+    flags = os.O_WRONLY | os.O_CREAT | os.O_TRUNC | getattr(os, "O_BINARY", 0)
+    fd = os.open(tmp, flags, 0o666)
+    try:
+        try:
+            try:
+                modo = stat.S_IMODE(os.stat(path).st_mode)
+            except FileNotFoundError:
+                pass
+            else:
+                if hasattr(os, "fchmod"):
+                    os.fchmod(fd, modo)
+                else:
+                    os.chmod(tmp, modo)
+
+            view = memoryview(data)
+            while view:
+                view = view[os.write(fd, view):]
+            os.fsync(fd)
+            mtime = os.fstat(fd).st_mtime_ns
+        finally:
+            os.close(fd)
+
+        with lock:
+            os.replace(tmp, path)
+            if ao_trocar:
+                ao_trocar(mtime)
+    except BaseException:
+        # não deixa o temporário para trás se algo falhar
+        try:
+            os.unlink(tmp)
+        except FileNotFoundError:
+            pass
+        raise
 
 
-def salvar_tarefas(tarefas):
-    with lock:
-        with open(DB_FILE, "w", encoding="utf-8") as f:
-            json.dump(tarefas, f, indent=4, ensure_ascii=False)
+def salvar_tarefas(tarefas, compact=False):
+    _atomic_write_bytes(DB_FILE, _dumps(tarefas, compact),
+                        lambda mtime: _atualizar_cache(tarefas, mtime))
 
 
 # =========================
 # Lógica de tarefas
 # =========================
 
-def remover_vencidas(notificar=True):
-    tarefas = carregar_tarefas()
-    agora_dt = agora()
+def remover_vencidas(notificar=True, force=False):
+    global _LAST_SWEEP
+    # varredura recente (ex.: do checador): não repete, salvo se forçada.
+    # Relógio monotônico: ajustes no relógio do sistema não travam isso.
+    agora_mono = time.monotonic()
+    if not force and _LAST_SWEEP is not None and agora_mono - _LAST_SWEEP < 5.0:
+        return
+    _LAST_SWEEP = agora_mono
+
+    now_ts = time.time()
+    cache = _carregar_cache()
+    proximo = cache["proximo_prazo"]
+    if proximo is None or proximo > now_ts:
+        return
 
     restantes = []
     removidas = []
+    manter = restantes.append
+    remover = removidas.append
 
-    for t in tarefas:
-        prazo = None
-        if t.get("prazo"):
-            try:
-                prazo = datetime.fromisoformat(t["prazo"])
-            except Exception:
-                prazo = None
-
-        if prazo and prazo <= agora_dt:
-            removidas.append(t)
+    for t in cache["tarefas"]:
+        if (ts := t.get("prazo_ts")) and ts <= now_ts:
+            remover(t)
         else:
-            restantes.append(t)
+            manter(t)
 
     if removidas:
-        salvar_tarefas(restantes)
+        salvar_tarefas(restantes, compact=True)
         if notificar:
             for r in removidas:
                 print(f"[AUTO] Removida por prazo vencido: [{r['id'][:8]}] {r['titulo']}")
@@ -161,8 +359,9 @@ def criar_tarefa_interativa():
         "descricao": descricao,
         "quantidade": quantidade,
         "prazo": prazo.isoformat() if prazo else None,
+        "prazo_ts": prazo.timestamp() if prazo else None,
         "concluida": False,
-        "criado_em": agora().isoformat(),
+        "criado_em_ts": time.time(),
         "ultimo_tempo_seg": 0,
         "total_tempo_seg": 0,
     }
@@ -182,20 +381,31 @@ def listar_tarefas_interativo():
         print("Nenhuma tarefa registrada.")
         return
 
-    pendentes = [t for t in tarefas if not t.get("concluida")]
-    concluidas = [t for t in tarefas if t.get("concluida")]
+    pendentes = []
+    concluidas = []
+    add_pendente = pendentes.append
+    add_concluida = concluidas.append
+    for t in tarefas:
+        if t.get("concluida"):
+            add_concluida(t)
+        else:
+            add_pendente(t)
 
     def imprimir(lista, titulo):
+        # nomes locais: evita buscas globais/atributos a cada tarefa
+        _divmod = divmod
+        _format_prazo = format_prazo
         print(f"\n--- {titulo} ({len(lista)}) ---")
         for t in lista:
-            qtd = t.get("quantidade") or "—"
-            prazo = format_prazo(t.get("prazo"))
+            get = t.get
+            qtd = get("quantidade") or "—"
+            prazo = _format_prazo(get("prazo_ts") or get("prazo"))
             print(f"[{t['id'][:8]}] {t['titulo']} | qtd:{qtd} | prazo:{prazo}")
-            if t.get("descricao"):
+            if get("descricao"):
                 print("   desc:", t["descricao"])
-            if t.get("ultimo_tempo_seg"):
-                m, s = divmod(t["ultimo_tempo_seg"], 60)
-                tm, ts = divmod(t.get("total_tempo_seg", 0), 60)
+            if get("ultimo_tempo_seg"):
+                m, s = _divmod(t["ultimo_tempo_seg"], 60)
+                tm, ts = _divmod(get("total_tempo_seg", 0), 60)
                 print(f"   último: {m}m{s}s | total: {tm}m{ts}s")
 
     imprimir(pendentes, "Pendentes")
@@ -203,28 +413,39 @@ def listar_tarefas_interativo():
 
 
 def selecionar_tarefa(prompt="ID ou parte do título: "):
-    tarefas = carregar_tarefas()
     q = input(prompt).strip().lower()
     if not q:
         return None
 
-    encontrados = [
-        t for t in tarefas
-        if q in t["id"] or q in t["titulo"].lower()
-    ]
+    cache = _carregar_cache()
+    if len(q) == 8:
+        t = cache["id_prefix"].get(q)
+        if t:
+            return dict(t)
+
+    # um único str.find sobre o texto de busca; a cada ocorrência,
+    # pula para a próxima tarefa para não repetir resultados
+    tarefas, haystack, offsets = cache["tarefas"], cache["haystack"], cache["offsets"]
+    encontrados = []
+    pos = 0
+    if "\0" not in q:
+        while (idx := haystack.find(q, pos)) != -1:
+            i = bisect_right(offsets, idx) - 1
+            encontrados.append(tarefas[i])
+            pos = offsets[i + 1]
 
     if not encontrados:
         print("Nenhuma tarefa encontrada.")
         return None
 
     if len(encontrados) == 1:
-        return encontrados[0]
+        return dict(encontrados[0])
 
     for i, t in enumerate(encontrados, 1):
         print(i, f"[{t['id'][:8]}] {t['titulo']}")
 
     idx = input("Escolha: ").strip()
-    return encontrados[int(idx) - 1] if idx.isdigit() and 0 < int(idx) <= len(encontrados) else None
+    return dict(encontrados[int(idx) - 1]) if idx.isdigit() and 0 < int(idx) <= len(encontrados) else None
 
 
 def editar_tarefa_interativa():
@@ -249,22 +470,21 @@ def editar_tarefa_interativa():
     else:
         t["quantidade"] = None
 
-    prazo_raw = input(f"Prazo [{format_prazo(t.get('prazo'))}]: ").strip()
+    prazo_raw = input(f"Prazo [{format_prazo(t.get('prazo_ts') or t.get('prazo'))}]: ").strip()
     if prazo_raw:
         prazo = parse_prazo(prazo_raw)
         if prazo:
             t["prazo"] = prazo.isoformat()
+            t["prazo_ts"] = prazo.timestamp()
 
     if input("Marcar como concluída? (s/N): ").strip().lower() in ("s", "sim"):
         t["concluida"] = True # desmarcar se NÃO
     else:
         t["concluida"] = False
 
-    tarefas = carregar_tarefas()
-    for i, item in enumerate(tarefas):
-        if item["id"] == t["id"]:
-            tarefas[i] = t
-            break
+    tarefas, item = localizar_tarefa(t["id"])
+    if item is not None:
+        item.update(t)
 
     salvar_tarefas(tarefas)
     print("Tarefa atualizada.")
@@ -286,13 +506,13 @@ def marcar_tarefa():
     if not t:
         return
 
-    tarefas = carregar_tarefas()
-    for i, item in enumerate(tarefas):
-        if item["id"] == t["id"]:
-            tarefas[i]["concluida"] = not item.get("concluida", False)
-            salvar_tarefas(tarefas)
-            print("Estado alterado.")
-            return
+    tarefas, item = localizar_tarefa(t["id"])
+    if item is None:
+        return
+
+    item["concluida"] = not item.get("concluida", False)
+    salvar_tarefas(tarefas)
+    print("Estado alterado.")
 
 
 def iniciar_cronometro():
@@ -304,20 +524,20 @@ def iniciar_cronometro():
     if input().strip().lower() == "q":
         return
 
-    inicio = time.time()
+    # relógio monotônico: imune a ajustes do relógio do sistema
+    inicio = time.monotonic_ns()
     input()
-    dur = int(time.time() - inicio)
+    dur = (time.monotonic_ns() - inicio) // 1_000_000_000
 
-    tarefas = carregar_tarefas()
-    for i, item in enumerate(tarefas):
-        if item["id"] == t["id"]:
-            item["ultimo_tempo_seg"] = dur
-            item["total_tempo_seg"] = item.get("total_tempo_seg", 0) + dur
-            tarefas[i] = item
-            salvar_tarefas(tarefas)
-            m, s = divmod(dur, 60)
-            print(f"Cronômetro salvo: {m}m{s}s")
-            return
+    tarefas, item = localizar_tarefa(t["id"])
+    if item is None:
+        return
+
+    item["ultimo_tempo_seg"] = dur
+    item["total_tempo_seg"] = item.get("total_tempo_seg", 0) + dur
+    salvar_tarefas(tarefas)
+    m, s = divmod(dur, 60)
+    print(f"Cronômetro salvo: {m}m{s}s")
 
 
 # =========================
@@ -325,13 +545,17 @@ def iniciar_cronometro():
 # =========================
 
 def checador_periodico():
+    # a primeira varredura já foi feita por menu_principal
     while True:
-        remover_vencidas(notificar=True)
         time.sleep(60)
+        remover_vencidas(notificar=True, force=True)
 
 
 def menu_principal():
     print("\n\n\t=== TASKFORGE ===\n")
+    # varre as vencidas antes do primeiro comando, para nenhuma tarefa
+    # já vencida ser selecionada; a thread sobe só depois dessa varredura
+    remover_vencidas(notificar=True, force=True)
     threading.Thread(target=checador_periodico, daemon=True).start()
 
     while True:
@@ -356,5 +580,6 @@ def menu_principal():
 if __name__ == "__main__":
     if not os.path.exists(DB_FILE):
         salvar_tarefas([])
+    migrar_uma_vez()
     print("Gerenciador iniciado | Datas:", DATE_FMT)
     menu_principal()